@@ -1,10 +1,67 @@
 import time
-import copy
 import math
+import weakref
 
 import pygame
 from pygame import gfxdraw
 from threading import Thread
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+
+# Drawing functions used on every frame, bound once to skip the module attribute lookups on each call
+_draw_rect = pygame.draw.rect
+_draw_ellipse = pygame.draw.ellipse
+_draw_polygon = pygame.draw.polygon
+_draw_line = pygame.draw.line
+
+# Transformation types stored in the applied transformations of each state
+_ROT = 0
+_TRA = 1
+_SCL = 2
+
+# Points around the unit circle, scaled and rotated to draw rotated ellipses as polygons
+_ELLIPSE_SEGMENTS = 64
+_UNIT_CIRCLE = tuple((math.cos(2 * math.pi * i / _ELLIPSE_SEGMENTS), math.sin(2 * math.pi * i / _ELLIPSE_SEGMENTS))
+                     for i in range(_ELLIPSE_SEGMENTS))
+
+# Once the dirty rects of a frame cover this fraction of the screen, or there are more of them than this count,
+# flipping the whole display is cheaper than updating each area
+_FLIP_AREA_FRACTION = 0.25
+_MAX_DIRTY_RECTS = 64
+
+
+# Placement functions for the draw modes of rect_mode() and circle_mode()
+def _origin_from_top_left(x: float, y: float, w: float, h: float) -> tuple:
+    """
+    Gets the top-left corner of a box whose (x,y) coordinates already are its top-left corner
+    """
+    return x, y
+
+
+def _origin_from_center(x: float, y: float, w: float, h: float) -> tuple:
+    """
+    Gets the top-left corner of a box whose (x,y) coordinates are its center
+    """
+    return x - w / 2, y - h / 2
+
+
+def _center_from_top_left(x: float, y: float, w: float, h: float) -> tuple:
+    """
+    Gets the center of a box whose (x,y) coordinates are its top-left corner (used for certain cases of rotation)
+    """
+    return x + w / 2, y + h / 2
+
+
+def _center_from_center(x: float, y: float, w: float, h: float) -> tuple:
+    """
+    Gets the center of a box whose (x,y) coordinates already are its center (used for certain cases of rotation)
+    """
+    return x, y
+
+
+# Each draw mode maps to the pair of (origin, center) functions bound when the mode is changed
+_DRAW_MODES = {'TOP_LEFT': (_origin_from_top_left, _center_from_top_left),
+               'CENTER': (_origin_from_center, _center_from_center)}
 
 
 class _InstanceControl:
@@ -25,6 +82,103 @@ class _InstanceControl:
 _instance_handler = _InstanceControl()
 
 
+@lru_cache(maxsize=128)
+def _load_font(name: str, size: int, bold: bool, italic: bool, underline: bool) -> pygame.font.Font:
+    """
+    Loads a font from the system, each combination of parameters is only loaded from disk once
+    """
+    font_path = pygame.font.match_font(name)
+    font_object = pygame.font.Font(font_path, size)
+
+    font_object.set_bold(bold)
+    font_object.set_italic(italic)
+    font_object.set_underline(underline)
+
+    return font_object
+
+
+@lru_cache(maxsize=256)
+def _render_text(font: pygame.font.Font, style: tuple, string: str, anti_aliasing: bool,
+                 color: tuple) -> pygame.surface.Surface:
+    """
+    Renders a string with a font, so that labels drawn every frame are only rasterized once. The style of the font
+    (bold, italic, underline) is only passed so a font changed after being cached renders again
+    """
+    return font.render(string, anti_aliasing, color)
+
+
+def _clear_font_caches():
+    """
+    Releases the cached fonts and rendered texts, which can't be used anymore once the font module is shut down
+    """
+    _load_font.cache_clear()
+    _render_text.cache_clear()
+
+
+def _transform_image(img: pygame.surface.Surface, target_width: float, target_height: float, angle: float,
+                     force_transparency: bool) -> pygame.surface.Surface:
+    """
+    Resizes and rotates an image the way image() draws it, returning the image itself when nothing changes
+    """
+    size = img.get_size()
+
+    # Images that already have per-pixel alpha don't need to be copied onto a transparent surface
+    if force_transparency and not img.get_flags() & pygame.SRCALPHA:
+        intermediary_surface = pygame.surface.Surface(size, flags=pygame.SRCALPHA)
+        intermediary_surface.blit(img, (0, 0))
+        img = intermediary_surface
+
+    # Quarter turns are left to pygame.transform.rotate(), which turns them into plain pixel copies. rotozoom() drops
+    # colorkeys and pads images without per-pixel alpha with black, so those are also left to rotate()
+    if (angle % 90 != 0 and img.get_flags() & pygame.SRCALPHA and size[0] != 0
+            and target_width * size[1] == target_height * size[0]):
+        # Uniform scaling and rotation are done in a single pass, without an intermediate scaled surface
+        return pygame.transform.rotozoom(img, -angle, target_width / size[0])
+
+    # Scaling always allocates a new surface, so it's skipped when the size doesn't change
+    if target_width != size[0] or target_height != size[1]:
+        img = pygame.transform.scale(img, (target_width, target_height))
+
+    # Without rotation the (possibly scaled) image is blitted as it is
+    if angle != 0:
+        img = pygame.transform.rotate(img, -angle)
+
+    return img
+
+
+# Transformed versions of the images drawn with image(cache=True), kept only while the original image exists
+_image_cache = weakref.WeakKeyDictionary()
+_IMAGE_CACHE_VARIANTS = 16
+# Cached images are rotated in steps of this many degrees, so slowly changing angles still reuse cached versions
+_IMAGE_CACHE_ANGLE_STEP = 0.25
+
+
+def _transform_image_cached(img: pygame.surface.Surface, target_width: float, target_height: float, angle: float,
+                            force_transparency: bool) -> pygame.surface.Surface:
+    """
+    Same as _transform_image(), but reuses the result when the same image is drawn with the same size and angle
+    """
+    angle = round(angle / _IMAGE_CACHE_ANGLE_STEP) * _IMAGE_CACHE_ANGLE_STEP
+
+    variants = _image_cache.get(img)
+    if variants is None:
+        variants = _image_cache[img] = {}
+
+    key = (target_width, target_height, angle, force_transparency)
+    result = variants.get(key)
+
+    if result is None:
+        result = _transform_image(img, target_width, target_height, angle, force_transparency)
+
+        # The original image can't be stored as its own variant, otherwise it would never be released
+        if result is not img:
+            if len(variants) >= _IMAGE_CACHE_VARIANTS:
+                variants.clear()
+            variants[key] = result
+
+    return result
+
+
 class _RepeatTimer:
     """
     Helper class for a repeated timer
@@ -46,11 +200,18 @@ class _RepeatTimer:
 
             if self.func is None:
                 return
-            else:
-                self.func()
 
-            if self.interval != 0:
-                time.sleep(self.interval)
+            start = time.perf_counter()
+            self.func()
+
+            # Sleeps the coarse part of what is left of the interval and yields until the deadline for the rest,
+            # so the time spent in func() is accounted for and time.sleep() imprecision does not add up
+            remaining = self.interval - (time.perf_counter() - start)
+            if remaining > 0.002:
+                time.sleep(remaining - 0.001)
+
+            while time.perf_counter() - start < self.interval:
+                time.sleep(0)
 
     def quit(self):
         self.flag = True
@@ -63,12 +224,22 @@ class _SimulationData:
     """
     Helper class to hold simulation data
     """
-    def __init__(self):
-        self.draw_mode = {'TOP_LEFT': 0, 'CENTER': 1}
-        self.transformations = {'ROT': 0, 'TRA': 1, 'SCL': 2}
+    __slots__ = ('applied_transformations', 'matrix', 'matrix_no_rotation', 'inverse_matrix', 'flag_has_rotation',
+                 'cumulative_rotation_angle', 'flag_has_scaling', 'cumulative_scaling_factor',
+                 'account_for_transformations', 'rect_origin', 'rect_center', 'circle_origin', 'circle_center',
+                 'current_stroke_color', 'current_fill_color', 'current_background_color', 'current_stroke_weight',
+                 'erase_state', 'anti_aliasing', 'fill_state', 'stroke_state', 'effective_stroke_color',
+                 'effective_fill_color', 'current_text_font', 'custom_font_object')
 
+    def __init__(self):
         self.applied_transformations = []
 
+        # Affine matrices (a, b, c, d, e, f) composed from applied_transformations, where a point is transformed as
+        # (a * x + b * y + c, d * x + e * y + f). They're None until needed again after the transformations change
+        self.matrix = None
+        self.matrix_no_rotation = None
+        self.inverse_matrix = None
+
         self.flag_has_rotation = False
         self.cumulative_rotation_angle = 0
 
@@ -77,12 +248,14 @@ class _SimulationData:
 
         self.account_for_transformations = False
 
-        self.current_rect_mode = self.draw_mode['TOP_LEFT']
-        self.current_circle_mode = self.draw_mode['CENTER']
+        # Functions that place the (x,y) coordinates of shapes according to the current rect and circle modes
+        self.rect_origin, self.rect_center = _DRAW_MODES['TOP_LEFT']
+        self.circle_origin, self.circle_center = _DRAW_MODES['CENTER']
 
-        self.current_stroke_color = (0, 0, 0)
-        self.current_fill_color = (0, 0, 0)
-        self.current_background_color = (125, 125, 125)
+        # Colors are kept as pygame.Color so they don't need to be converted on every draw call
+        self.current_stroke_color = pygame.Color(0, 0, 0)
+        self.current_fill_color = pygame.Color(0, 0, 0)
+        self.current_background_color = pygame.Color(125, 125, 125)
         self.current_stroke_weight = 1
 
         self.erase_state = False
@@ -92,9 +265,138 @@ class _SimulationData:
         self.fill_state = True
         self.stroke_state = True
 
+        # Colors actually used by shapes, taking erasing and disabled fill/stroke into account
+        self.effective_stroke_color = self.current_stroke_color
+        self.effective_fill_color = self.current_fill_color
+
         self.current_text_font = pygame.font.get_default_font()
         self.custom_font_object = None
 
+    def copy_from(self, other):
+        """
+        Copies all values from another state into this one, used when pushing a temporary state
+
+        :param other: The instance of _SimulationData to copy the values from
+        """
+        # Lists are copied in place to avoid referencing
+        self.applied_transformations[:] = other.applied_transformations
+
+        self.matrix = other.matrix
+        self.matrix_no_rotation = other.matrix_no_rotation
+        self.inverse_matrix = other.inverse_matrix
+
+        self.flag_has_rotation = other.flag_has_rotation
+        self.cumulative_rotation_angle = other.cumulative_rotation_angle
+
+        self.flag_has_scaling = other.flag_has_scaling
+        self.cumulative_scaling_factor[:] = other.cumulative_scaling_factor
+
+        self.account_for_transformations = other.account_for_transformations
+
+        self.rect_origin = other.rect_origin
+        self.rect_center = other.rect_center
+        self.circle_origin = other.circle_origin
+        self.circle_center = other.circle_center
+
+        self.current_stroke_color = other.current_stroke_color
+        self.current_fill_color = other.current_fill_color
+        self.current_background_color = other.current_background_color
+        self.current_stroke_weight = other.current_stroke_weight
+
+        self.erase_state = other.erase_state
+
+        self.anti_aliasing = other.anti_aliasing
+
+        self.fill_state = other.fill_state
+        self.stroke_state = other.stroke_state
+
+        self.effective_stroke_color = other.effective_stroke_color
+        self.effective_fill_color = other.effective_fill_color
+
+        self.current_text_font = other.current_text_font
+        self.custom_font_object = other.custom_font_object
+
+    def colors_changed(self):
+        """
+        Updates the effective stroke and fill colors, must be called whenever a color, erasing, fill or stroke changes
+        """
+        if self.erase_state:
+            stroke_color = fill_color = self.current_background_color
+        else:
+            stroke_color = self.current_stroke_color
+            fill_color = self.current_fill_color
+
+        self.effective_stroke_color = stroke_color if self.stroke_state else None
+        self.effective_fill_color = fill_color if self.fill_state else None
+
+    def transformations_changed(self):
+        """
+        Discards the cached matrices, must be called whenever applied_transformations is modified
+        """
+        self.matrix = None
+        self.matrix_no_rotation = None
+        self.inverse_matrix = None
+
+    def get_matrix(self, no_rotation: bool = False) -> tuple:
+        """
+        Gets the affine matrix equivalent to applying all transformations in order, composing it only when needed
+
+        :param no_rotation: Whether rotations should be skipped
+        :return: A tuple (a, b, c, d, e, f) with the coefficients of the matrix
+        """
+        matrix = self.matrix_no_rotation if no_rotation else self.matrix
+
+        if matrix is not None:
+            return matrix
+
+        a, b, c, d, e, f = 1, 0, 0, 0, 1, 0
+
+        for transformation in self.applied_transformations:
+            if transformation[0] == _SCL:
+                scale_x, scale_y = transformation[1]
+                a, b, c = a * scale_x, b * scale_x, c * scale_x
+                d, e, f = d * scale_y, e * scale_y, f * scale_y
+
+            if transformation[0] == _TRA:
+                c += transformation[1][0]
+                f += transformation[1][1]
+
+            if transformation[0] == _ROT and not no_rotation:
+                angle, angle_sin, angle_cos = transformation[1]
+                a, b, c, d, e, f = (a * angle_cos - d * angle_sin, b * angle_cos - e * angle_sin,
+                                    c * angle_cos - f * angle_sin, a * angle_sin + d * angle_cos,
+                                    b * angle_sin + e * angle_cos, c * angle_sin + f * angle_cos)
+
+        matrix = (a, b, c, d, e, f)
+
+        if no_rotation:
+            self.matrix_no_rotation = matrix
+        else:
+            self.matrix = matrix
+
+        return matrix
+
+    def get_inverse_matrix(self) -> tuple:
+        """
+        Gets the inverse of the matrix given by get_matrix(), used to undo all transformations at once
+
+        :return: A tuple (a, b, c, d, e, f) with the coefficients of the inverse matrix
+        """
+        if self.inverse_matrix is not None:
+            return self.inverse_matrix
+
+        a, b, c, d, e, f = self.get_matrix()
+
+        # Scaling by 0 is ignored by scale(), so the matrix can always be inverted
+        determinant = a * e - b * d
+
+        inv_a, inv_b = e / determinant, -b / determinant
+        inv_d, inv_e = -d / determinant, a / determinant
+
+        self.inverse_matrix = (inv_a, inv_b, -inv_a * c - inv_b * f, inv_d, inv_e, -inv_d * c - inv_e * f)
+
+        return self.inverse_matrix
+
 
 class _ControlClass:
     """
@@ -111,31 +413,52 @@ class _ControlClass:
         self.mouse_button_down = None
         self.mouse_wheel = None
 
-    @staticmethod
-    def run(func, data):
-        if func is not None:
-            func(data)
+        # Maps event types to the callbacks set for them, so each event only needs one lookup
+        self.callbacks = {}
+
+    def update_callbacks(self):
+        """
+        Rebuilds the mapping of event types to callbacks, only events with a callback set are kept
+        """
+        callbacks = {
+            pygame.KEYDOWN: self.key_down,
+            pygame.KEYUP: self.key_up,
+            pygame.MOUSEMOTION: self.mouse_motion,
+            pygame.MOUSEBUTTONUP: self.mouse_button_up,
+            pygame.MOUSEBUTTONDOWN: self.mouse_button_down,
+            pygame.MOUSEWHEEL: self.mouse_wheel
+        }
+
+        self.callbacks = {event_type: func for event_type, func in callbacks.items() if func is not None}
+
+    def filter_events(self):
+        """
+        Blocks input events without a callback from reaching the event queue, so they aren't processed every frame
+        """
+        input_events = [pygame.KEYDOWN, pygame.KEYUP, pygame.MOUSEMOTION, pygame.MOUSEBUTTONUP,
+                        pygame.MOUSEBUTTONDOWN, pygame.MOUSEWHEEL]
+
+        pygame.event.set_blocked([event_type for event_type in input_events if event_type not in self.callbacks])
+        pygame.event.set_allowed([event_type for event_type in input_events if event_type in self.callbacks])
 
     def event_handler(self, events):
+        callbacks = self.callbacks
+
         for event in events:
+            callback = callbacks.get(event.type)
+            if callback is not None:
+                callback(event.__dict__)
+                continue
+
             if event.type == pygame.ACTIVEEVENT:
                 if hasattr(event, 'state'):
                     self.main_instance.focused = not event.state == 1
+            if event.type == pygame.VIDEOEXPOSE:
+                # The window contents need to be sent again as a whole, not only what changed this frame
+                self.main_instance._full_update = True
             if event.type == pygame.QUIT:
                 self.main_instance.quit()
                 return
-            if event.type == pygame.KEYDOWN:
-                self.run(self.key_down, event.__dict__)
-            if event.type == pygame.KEYUP:
-                self.run(self.key_up, event.__dict__)
-            if event.type == pygame.MOUSEMOTION:
-                self.run(self.mouse_motion, event.__dict__)
-            if event.type == pygame.MOUSEBUTTONUP:
-                self.run(self.mouse_button_up, event.__dict__)
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                self.run(self.mouse_button_down, event.__dict__)
-            if event.type == pygame.MOUSEWHEEL:
-                self.run(self.mouse_wheel, event.__dict__)
 
 
 class EduDraw:
@@ -154,6 +477,18 @@ class EduDraw:
 
         self.screen: pygame.surface.Surface | None = None
 
+        # Areas of the screen drawn onto during the current frame, only those are sent to the display
+        self._dirty_rects = []
+        self._full_update = False
+
+        # Reused by rect-based primitives instead of building a new rect on every call
+        self._scratch_rect = pygame.Rect(0, 0, 0, 0)
+
+        # Worker used by save() to encode pictures outside of the frame, created on the first save
+        self._save_executor = None
+        # Saves that haven't been checked for errors yet
+        self._pending_saves = []
+
         self.setup = None
         self.draw = None
 
@@ -161,13 +496,21 @@ class EduDraw:
         self.reset_after_loop = True
         self.frame_count = 0
 
+        # When draw() takes longer than a frame, the frames that were missed are skipped instead of being drawn in a
+        # burst to catch up
+        self.allow_frame_skip = True
+        self.frames_skipped = 0
+
         self.focused = True
 
         self.original_font_instance = None
 
         self.data = _SimulationData()
-        # Data stack used for temporary states
-        self.data_stack = []
+        # Pool of states used by push() and pop(), reused so temporary states don't need to be allocated every time
+        self._data_pool = [_SimulationData() for _ in range(16)]
+        self._stack_depth = 0
+        # The simulation data currently being operated upon, kept in sync with the stack depth
+        self._active_data = self.data
 
         self.controls = _ControlClass(self)
 
@@ -177,8 +520,9 @@ class EduDraw:
         """
 
         self.data = _SimulationData()
-        self.data_stack = []
+        self._stack_depth = 0
         self.data.custom_font_object = self.original_font_instance
+        self._active_data = self.data
 
     def _proto_setup(self):
         self.setup()
@@ -188,7 +532,8 @@ class EduDraw:
         Function called every tick of the timer. Serves as the backbone of the draw() function
         """
         if self.quitted:
-            self.timeloop.quit()
+            if self.timeloop is not None:
+                self.timeloop.quit()
             return
 
         self.frame_count += 1
@@ -196,7 +541,18 @@ class EduDraw:
         self.draw()
 
         if not self.null_mode:
-            pygame.display.update()
+            dirty_rects = self._dirty_rects
+
+            # The count is checked first, so the area is only summed over a few rects. Overlapping rects are counted
+            # more than once, which only makes flipping happen a bit sooner
+            if (self._full_update or len(dirty_rects) > _MAX_DIRTY_RECTS
+                    or sum(rect.w * rect.h for rect in dirty_rects) >= self.width * self.height * _FLIP_AREA_FRACTION):
+                pygame.display.flip()
+            else:
+                pygame.display.update(dirty_rects)
+
+        self._dirty_rects.clear()
+        self._full_update = False
 
         if self.reset_after_loop:
             self._reset_variables()
@@ -205,15 +561,49 @@ class EduDraw:
         """
         Sets up environment for drawing
         """
-        self.timeloop = _RepeatTimer(self.deltatime, self.timer_tick)
-        self.timeloop.start()
-
         if self.null_mode:
+            # Null mode instances never touch the display, so they can keep ticking on their own thread
+            self.timeloop = _RepeatTimer(self.deltatime, self.timer_tick)
+            self.timeloop.start()
             return
 
+        self.controls.filter_events()
         pygame.display.flip()
+
+        # Drawing happens on this thread, waiting for events doubles as the frame clock
+        next_tick = time.perf_counter()
         while not self.quitted:
-            self.controls.event_handler(pygame.event.get())
+            timeout = int((next_tick - time.perf_counter()) * 1000)
+
+            if timeout > 0:
+                event = pygame.event.wait(timeout)
+                events = pygame.event.get()
+                if event.type != pygame.NOEVENT:
+                    events.insert(0, event)
+            else:
+                events = pygame.event.get()
+
+            self.controls.event_handler(events)
+
+            if self.quitted:
+                return
+
+            if time.perf_counter() >= next_tick:
+                self.timer_tick()
+
+                interval = self.deltatime / 1000
+                next_tick += interval
+
+                # At max frame rate the deadline doesn't move, so it's kept at the present to keep a later
+                # frame_rate() from counting that whole period as missed frames
+                if interval == 0:
+                    next_tick = time.perf_counter()
+
+                behind = time.perf_counter() - next_tick
+                if self.allow_frame_skip and interval > 0 and behind > interval:
+                    missed = int(behind / interval)
+                    self.frames_skipped += missed
+                    next_tick += missed * interval
 
     def start(self, setup, draw, window_title: str):
         """
@@ -227,9 +617,10 @@ class EduDraw:
         self.draw = draw
 
         if not pygame.font.get_init():
+            _clear_font_caches()
             pygame.font.init()
 
-        data = self._get_data_object()
+        data = self._active_data
         self.original_font_instance = pygame.font.SysFont(data.current_text_font, 15)
         data.custom_font_object = self.original_font_instance
 
@@ -243,185 +634,128 @@ class EduDraw:
         self._proto_setup()
         self._proto_draw()
 
-    def _get_data_object(self) -> _SimulationData:
-        """
-        Retrieves the correct simulation data class to operate upon
-        :return: An instace of _SimulationData
-        """
-        if not self.data_stack:
-            return self.data
-        else:
-            return self.data_stack[-1]
-
-    def _get_rect_box(self, x: int, y: int, w: int, h: int, inverted: bool = False) -> tuple:
+    def _get_stroke_fill_and_weight(self, data: _SimulationData) -> tuple:
         """
-        Gets the correct place for the (x,y) coordinates of the top-left corner of rectangle-based geometry
+        Gets the correct stroke_color and fill_color to be used in current state conditions
 
-        :param x: The original x coordinate of the top-left coordinate
-        :param y: The original y coordinate of the top-left coordinate
-        :param w: The width of the rectangle
-        :param h: The height of the rectangle
-        :param inverted: Whether the box needs to be inverted (for certain cases of rotation)
-        :return: The (x,y) tuple of the new positions
+        :param data: The state currently being drawn with
+        :return: A tuple containing (stroke_color, fill_color), which both are tuples of (R, G, B) values
         """
 
-        data = self._get_data_object()
-
-        if data.current_rect_mode == data.draw_mode['TOP_LEFT']:
-            if inverted:
-                return x + w / 2, y + h / 2
-            return x, y
-        else:
-            if inverted:
-                return x, y
-            return x - w / 2, y - h / 2
+        return data.effective_stroke_color, data.effective_fill_color, data.current_stroke_weight
 
-    def _get_circle_box(self, x: int, y: int, w: int, h: int, inverted: bool = False) -> tuple:
+    def _stroke_is_visible(self, data: _SimulationData, stroke_color, fill_color, stroke_weight: int,
+                           inside_fill: bool = True) -> bool:
         """
-        Gets the correct place for the (x,y) coordinates of the top-left corner of circle-based geometry
+        Checks whether the stroke of a shape would change anything on the screen, so the extra draw call can be skipped
 
-        :param x: The original x coordinate of the top-left coordinate
-        :param y: The original y coordinate of the top-left coordinate
-        :param w: The width of the rectangle containing the circle (2 * radius on circles)
-        :param h: The height of the rectangle containing the circle
-        :param inverted: Whether the box needs to be inverted (for certain cases of rotation)
-        :return: The (x,y) tuple of the new positions
+        :param data: The state currently being drawn with
+        :param stroke_color: The stroke color given by _get_stroke_fill_and_weight
+        :param fill_color: The fill color given by _get_stroke_fill_and_weight
+        :param stroke_weight: The stroke weight given by _get_stroke_fill_and_weight
+        :param inside_fill: Whether the stroke is drawn inside the filled area (rectangles and ellipses). Strokes of
+        polygons reach past their fill, so they're never considered to be hidden by it
+        :return: False if there is no stroke, if it has no width or if it's hidden by a fill of the same color
         """
 
-        data = self._get_data_object()
+        if not data.stroke_state or stroke_weight <= 0:
+            return False
 
-        if data.current_circle_mode == data.draw_mode['TOP_LEFT']:
-            if inverted:
-                return x + w / 2, y + h / 2
-            return x, y
-        else:
-            if inverted:
-                return x, y
-            return x - w / 2, y - h / 2
+        if inside_fill and data.fill_state and not data.anti_aliasing and stroke_color == fill_color:
+            return False
 
-    def _get_stroke_fill_and_weight(self) -> tuple:
-        """
-        Gets the correct stroke_color and fill_color to be used in current state conditions
+        return True
 
-        :return: A tuple containing (stroke_color, fill_color), which both are tuples of (R, G, B) values
+    def _is_off_screen(self, x: float, y: float, w: float, h: float) -> bool:
         """
+        Checks whether a box is entirely outside of the screen, so shapes inside it can be skipped before any drawing
+        work is done
 
-        data = self._get_data_object()
-
-        stroke_color = data.current_stroke_color
-        fill_color = data.current_fill_color
-        stroke_weight = data.current_stroke_weight
-
-        if data.erase_state:
-            stroke_color = data.current_background_color
-            fill_color = data.current_background_color
-
-        if not data.stroke_state:
-            stroke_color = None
-        if not data.fill_state:
-            fill_color = None
-
-        return stroke_color, fill_color, stroke_weight
+        :param x: The x coordinate of the top-left corner of the box, after transformations
+        :param y: The y coordinate of the top-left corner of the box, after transformations
+        :param w: The width of the box
+        :param h: The height of the box
+        :return: True if nothing inside the box would be visible
+        """
+        return x + w < 0 or y + h < 0 or x > self.width or y > self.height
 
-    def _apply_transformations_coords(self, x: int, y: int, no_rotation: bool = False) -> tuple:
+    def _apply_transformations_coords(self, data: _SimulationData, x: int, y: int,
+                                      no_rotation: bool = False) -> tuple:
         """
         Applies all transformations to coordinates in order defined by usage
 
+        :param data: The state currently being drawn with
         :param x: X value of coordinates
         :param y: Y value of coordinates
         :param no_rotation: Whether rotation should be skipped
         :return: A tuple containing the (X, Y) values of the new coordinate location
         """
-        final_x = x
-        final_y = y
+        if not data.applied_transformations:
+            return x, y
 
-        data = self._get_data_object()
+        a, b, c, d, e, f = data.get_matrix(no_rotation)
 
-        scale_tf = data.transformations['SCL']
-        translate_tf = data.transformations['TRA']
-        rotate_tf = data.transformations['ROT']
+        return a * x + b * y + c, d * x + e * y + f
 
-        for transformation in data.applied_transformations:
-            if transformation[0] == scale_tf:
-                final_x *= transformation[1][0]
-                final_y *= transformation[1][1]
+    def _apply_transformations_coords_batch(self, data: _SimulationData, points: list | tuple,
+                                            no_rotation: bool = False) -> list:
+        """
+        Applies all transformations to many coordinates at once, fetching the matrix a single time
 
-            if transformation[0] == translate_tf:
-                final_x += transformation[1][0]
-                final_y += transformation[1][1]
+        :param data: The state currently being drawn with
+        :param points: The (X, Y) tuples of the coordinates to be transformed
+        :param no_rotation: Whether rotation should be skipped
+        :return: A list containing the (X, Y) tuples of the new coordinate locations
+        """
+        if not data.applied_transformations:
+            return list(points)
 
-            if transformation[0] == rotate_tf and not no_rotation:
-                angle_sin = math.sin(math.radians(transformation[1]))
-                angle_cos = math.cos(math.radians(transformation[1]))
-                x = final_x * angle_cos - final_y * angle_sin
-                y = final_x * angle_sin + final_y * angle_cos
-                final_x = x
-                final_y = y
+        a, b, c, d, e, f = data.get_matrix(no_rotation)
 
-        return final_x, final_y
+        return [(a * x + b * y + c, d * x + e * y + f) for x, y in points]
 
-    def _apply_transformations_length(self, width: int, height: int) -> tuple:
+    def _apply_transformations_length(self, data: _SimulationData, width: int, height: int) -> tuple:
         """
         Applies all transformations to a set of lengths in order defined by usage
 
+        :param data: The state currently being drawn with
         :param width: The width to be manipulated
         :param height: The height to be manipulated
         :return: A tuple with the resulting width and height after transformations
         """
+        if not data.flag_has_scaling:
+            return width, height
+
         final_width = width
         final_height = height
 
-        data = self._get_data_object()
-
-        # scale_tf = data.transformations['SCL']
-
         final_width *= data.cumulative_scaling_factor[0]
         final_height *= data.cumulative_scaling_factor[1]
 
         # for transformation in data.applied_transformations:
         #     # Sizes are only affected by scaling
-        #     if transformation[0] == scale_tf:
+        #     if transformation[0] == _SCL:
         #         final_width *= transformation[1][0]
         #         final_height *= transformation[1][1]
 
         return final_width, final_height
 
-    def _undo_transformations_coords(self, x: int, y: int) -> tuple:
+    def _undo_transformations_coords(self, data: _SimulationData, x: int, y: int) -> tuple:
         """
         Undoes all transformations of a coordinate to retrieve it's original place.
         Used for mouse_pos()
 
+        :param data: The state currently being drawn with
         :param x: The x coordinate
         :param y: The y coordinate
         :return: A tuple with the (x, y) original coordinates
         """
-        final_x = x
-        final_y = y
-
-        data = self._get_data_object()
-
-        scale_tf = data.transformations['SCL']
-        translate_tf = data.transformations['TRA']
-        rotate_tf = data.transformations['ROT']
-
-        for transformation in reversed(data.applied_transformations):
-            if transformation[0] == scale_tf:
-                final_x /= transformation[1][0]
-                final_y /= transformation[1][1]
-
-            if transformation[0] == translate_tf:
-                final_x -= transformation[1][0]
-                final_y -= transformation[1][1]
+        if not data.applied_transformations:
+            return x, y
 
-            if transformation[0] == rotate_tf:
-                angle_sin = math.sin(math.radians(transformation[1]))
-                angle_cos = math.cos(math.radians(transformation[1]))
-                x = final_x * angle_cos + final_y * angle_sin
-                y = -final_x * angle_sin + final_y * angle_cos
-                final_x = x
-                final_y = y
+        a, b, c, d, e, f = data.get_inverse_matrix()
 
-        return final_x, final_y
+        return a * x + b * y + c, d * x + e * y + f
 
     @staticmethod
     def _compute_bezier_points(vertices: list, num_points: int = None):
@@ -693,9 +1027,8 @@ class EduDraw:
         :param mode: Mode may be 'TOP_LEFT' or 'CENTER'
         """
 
-        data = self._get_data_object()
-        new_mode = data.draw_mode[mode]
-        data.current_rect_mode = new_mode
+        data = self._active_data
+        data.rect_origin, data.rect_center = _DRAW_MODES[mode]
 
     def circle_mode(self, mode: str):
         """
@@ -703,9 +1036,8 @@ class EduDraw:
 
         :param mode: Mode may be 'TOP_LEFT' or 'CENTER'
         """
-        data = self._get_data_object()
-        new_mode = data.draw_mode[mode]
-        data.current_circle_mode = new_mode
+        data = self._active_data
+        data.circle_origin, data.circle_center = _DRAW_MODES[mode]
 
     def fill(self, color: tuple):
         """
@@ -713,17 +1045,19 @@ class EduDraw:
 
         :param color: A tuple containing the (R, G, B) values to fill subsequent shapes
         """
-        data = self._get_data_object()
+        data = self._active_data
         data.fill_state = True
-        data.current_fill_color = color
+        data.current_fill_color = pygame.Color(color)
+        data.colors_changed()
 
     def no_fill(self):
         """
         Specifies that subsequent shapes should not be filled in
         """
 
-        data = self._get_data_object()
+        data = self._active_data
         data.fill_state = False
+        data.colors_changed()
 
     def stroke(self, color: tuple):
         """
@@ -731,17 +1065,19 @@ class EduDraw:
 
         :param color: The color to be used, in an (R, G, B) tuple
         """
-        data = self._get_data_object()
+        data = self._active_data
         data.stroke_state = True
-        data.current_stroke_color = color
+        data.current_stroke_color = pygame.Color(color)
+        data.colors_changed()
 
     def no_stroke(self):
         """
         Specifies that subsequent shapes should not have their outlines drawn
         """
 
-        data = self._get_data_object()
+        data = self._active_data
         data.stroke_state = False
+        data.colors_changed()
 
     def stroke_weight(self, new_weight: int):
         """
@@ -750,7 +1086,7 @@ class EduDraw:
         :param new_weight: The size (in px) of the lines
         """
 
-        data = self._get_data_object()
+        data = self._active_data
         data.current_stroke_weight = new_weight
 
     def push(self):
@@ -758,21 +1094,22 @@ class EduDraw:
         Starts temporary state
         """
 
-        previous_data = self._get_data_object()
-
-        new_data = copy.copy(previous_data)
+        if self._stack_depth == len(self._data_pool):
+            self._data_pool.append(_SimulationData())
 
-        # To avoid referencing
-        new_data.applied_transformations = [i for i in previous_data.applied_transformations]
+        new_data = self._data_pool[self._stack_depth]
+        new_data.copy_from(self._active_data)
 
-        self.data_stack.append(new_data)
+        self._stack_depth += 1
+        self._active_data = new_data
 
     def pop(self):
         """
         Leaves temporary state
         """
-        if len(self.data_stack) != 0:
-            self.data_stack.pop()
+        if self._stack_depth != 0:
+            self._stack_depth -= 1
+            self._active_data = self._data_pool[self._stack_depth - 1] if self._stack_depth else self.data
 
     def mouse_pos(self) -> tuple:
         """
@@ -781,7 +1118,7 @@ class EduDraw:
         :return: A (x, y) tuple with the positions
         """
 
-        data = self._get_data_object()
+        data = self._active_data
 
         if self.null_mode:
             return 0, 0
@@ -791,7 +1128,7 @@ class EduDraw:
         if not data.account_for_transformations:
             return original_pos
 
-        final_pos = self._undo_transformations_coords(original_pos[0], original_pos[1])
+        final_pos = self._undo_transformations_coords(data, original_pos[0], original_pos[1])
         return int(final_pos[0]), int(final_pos[1])
 
     def rotate(self, angle: int):
@@ -800,10 +1137,13 @@ class EduDraw:
 
         :param angle: The angle (in degrees) to rotate the drawing
         """
-        data = self._get_data_object()
+        data = self._active_data
         data.flag_has_rotation = True
         data.cumulative_rotation_angle += angle
-        data.applied_transformations.append((data.transformations['ROT'], angle))
+        # The sine and cosine are stored along with the angle so they're only computed once per rotation
+        radians = math.radians(angle)
+        data.applied_transformations.append((_ROT, (angle, math.sin(radians), math.cos(radians))))
+        data.transformations_changed()
 
     def scale(self, scale_x: float, scale_y: float):
         """
@@ -815,11 +1155,12 @@ class EduDraw:
         if scale_x == 0 or scale_y == 0:
             return
 
-        data = self._get_data_object()
+        data = self._active_data
         data.flag_has_scaling = True
         data.cumulative_scaling_factor[0] *= scale_x
         data.cumulative_scaling_factor[1] *= scale_y
-        data.applied_transformations.append((data.transformations['SCL'], (scale_x, scale_y)))
+        data.applied_transformations.append((_SCL, (scale_x, scale_y)))
+        data.transformations_changed()
 
     def translate(self, translate_x: int, translate_y: int):
         """
@@ -828,15 +1169,17 @@ class EduDraw:
         :param translate_x: The amount to translate in the x axis
         :param translate_y: The amount to translate in the y axis
         """
-        data = self._get_data_object()
-        data.applied_transformations.append((data.transformations['TRA'], (translate_x, translate_y)))
+        data = self._active_data
+        data.applied_transformations.append((_TRA, (translate_x, translate_y)))
+        data.transformations_changed()
 
     def reset_transformations(self):
         """
         Resets all transformations
         """
-        data = self._get_data_object()
+        data = self._active_data
         data.applied_transformations = []
+        data.transformations_changed()
         data.flag_has_rotation = False
         data.flag_has_scaling = False
         data.cumulative_rotation_angle = 0
@@ -848,16 +1191,16 @@ class EduDraw:
 
         :param transformation: The transformation type to remove
         """
-        data = self._get_data_object()
+        data = self._active_data
         data.applied_transformations = [tf for tf in data.applied_transformations if tf[0] != transformation]
+        data.transformations_changed()
 
     def reset_scaling(self):
         """
         Resets all scaling operations done
         """
-        data = self._get_data_object()
-        scaling = data.transformations['SCL']
-        self._remove_transformation(scaling)
+        data = self._active_data
+        self._remove_transformation(_SCL)
         data.cumulative_scaling_factor = [1, 1]
         data.flag_has_scaling = False
 
@@ -865,17 +1208,14 @@ class EduDraw:
         """
         Resets all translation operations done
         """
-        data = self._get_data_object()
-        translation = data.transformations['TRA']
-        self._remove_transformation(translation)
+        self._remove_transformation(_TRA)
 
     def reset_rotation(self):
         """
         Resets all rotation operations done
         """
-        data = self._get_data_object()
-        rotation = data.transformations['ROT']
-        self._remove_transformation(rotation)
+        data = self._active_data
+        self._remove_transformation(_ROT)
         data.flag_has_rotation = False
         data.cumulative_rotation_angle = 0
 
@@ -884,7 +1224,7 @@ class EduDraw:
         Makes mouse_pos() take into account the transformations and give the original location instead
         :param state: The state of whether it should be taken into account or not
         """
-        data = self._get_data_object()
+        data = self._active_data
         data.account_for_transformations = state
 
     def set_controls(self, key_down=None, key_up=None, mouse_motion=None, mouse_button_up=None,
@@ -907,12 +1247,16 @@ class EduDraw:
         self.controls.mouse_button_up = mouse_button_up
         self.controls.mouse_button_down = mouse_button_down
         self.controls.mouse_wheel = mouse_wheel
+        self.controls.update_callbacks()
+
+        if not self.null_mode and pygame.display.get_init():
+            self.controls.filter_events()
 
     def toggle_antialiasing(self):
         """
         Toggles antialiasing for drawing shapes. Antialiasing is off by default.
         """
-        data = self._get_data_object()
+        data = self._active_data
 
         data.anti_aliasing = not data.anti_aliasing
 
@@ -920,13 +1264,17 @@ class EduDraw:
         """
         Makes all drawings erase from the canvas (i.e, their color will be the current background color)
         """
-        self._get_data_object().erase_state = True
+        data = self._active_data
+        data.erase_state = True
+        data.colors_changed()
 
     def no_erase(self):
         """
         Stops erasing shapes
         """
-        self._get_data_object().erase_state = False
+        data = self._active_data
+        data.erase_state = False
+        data.colors_changed()
     # Draw methods --------------------------------------------------------------------------------------
 
     def point(self, x: int, y: int):
@@ -937,16 +1285,65 @@ class EduDraw:
         :param y: The y coordinate to draw the point
         """
 
-        data = self._get_data_object()
+        data = self._active_data
+        screen = self.screen
 
         if not data.stroke_state:
             return
 
         stroke_color = data.current_stroke_color
 
-        x, y = self._apply_transformations_coords(x, y)
+        x, y = self._apply_transformations_coords(data, x, y)
+        x, y = int(x), int(y)
 
-        pygame.draw.circle(self.screen, stroke_color, (x, y), 1, 0)
+        screen.set_at((x, y), stroke_color)
+        self._dirty_rects.append(pygame.Rect(x, y, 1, 1))
+
+    def point_batch(self, points: list | tuple):
+        """
+        Draws many points at once with the current stroke color. This is faster than calling point() for each of
+        them, since the screen is only locked once for the whole batch.
+
+        :param points: A list containing the tuples of the coordinates of the points to be drawn, as in [(x1, y1),
+        (x2, y2), (x3, y3), ..., (xn, yn)]
+        """
+
+        data = self._active_data
+        screen = self.screen
+
+        if not data.stroke_state:
+            return
+
+        if data.applied_transformations:
+            points = self._apply_transformations_coords_batch(data, points)
+
+        mapped_color = screen.map_rgb(data.current_stroke_color)
+        set_at = screen.set_at
+
+        # The bounds of the batch are kept while drawing, so a single rect covers all of its points
+        min_x = min_y = math.inf
+        max_x = max_y = -math.inf
+
+        screen.lock()
+        try:
+            for x, y in points:
+                x, y = int(x), int(y)
+                set_at((x, y), mapped_color)
+
+                if x < min_x:
+                    min_x = x
+                if x > max_x:
+                    max_x = x
+                if y < min_y:
+                    min_y = y
+                if y > max_y:
+                    max_y = y
+        finally:
+            screen.unlock()
+
+        if min_x <= max_x:
+            bounds = pygame.Rect(min_x, min_y, max_x - min_x + 1, max_y - min_y + 1)
+            self._dirty_rects.append(bounds.clip(screen.get_rect()))
 
     def text(self, string: str, x: int, y: int):
         """
@@ -960,22 +1357,28 @@ class EduDraw:
         if string == '':
             return
 
-        stroke_color, fill_color, stroke_weight = self._get_stroke_fill_and_weight()
+        data = self._active_data
+
+        stroke_color, fill_color, stroke_weight = self._get_stroke_fill_and_weight(data)
 
-        data = self._get_data_object()
+        # Text is drawn with the fill color, so there's nothing to render when fill is disabled
+        if fill_color is None:
+            return
 
         font = data.custom_font_object
 
-        new_image = font.render(string, data.anti_aliasing, fill_color)
+        style = (font.get_bold(), font.get_italic(), font.get_underline())
+        new_image = _render_text(font, style, string, data.anti_aliasing, tuple(fill_color))
 
-        self.image(new_image, x, y)
+        # Rendered text is never modified, so its transformed versions can be reused
+        self.image(new_image, x, y, cache=True)
 
     def font(self, new_font: str, font_size: int = 12, bold=False, italic=False, underline=False):
         """
         Changes the font to be used when writing text.
         When the font is changed, all text will have it's font size, so the parameter for size in the text() method
-        is not used. Note: This is a costly method, if possible, it's recommended to use it once in setup() instead
-        of every frame in draw(). If you need to change font mid-drawing, it's recommended to use font_from_instance()
+        is not used. Note: Loading a font is costly, so each combination of parameters is only loaded the first time
+        it's used. If you need to change between many fonts mid-drawing, it's recommended to use font_from_instance()
         instead.
 
         :param new_font: The name of the new font to be used
@@ -984,14 +1387,9 @@ class EduDraw:
         :param italic: Whether the font should be italic or not
         :param underline: Whether the font should have an underline or not
         """
-        font_path = pygame.font.match_font(new_font)
-        font_object = pygame.font.Font(font_path, font_size)
+        font_object = _load_font(new_font, font_size, bold, italic, underline)
 
-        font_object.set_bold(bold)
-        font_object.set_italic(italic)
-        font_object.set_underline(underline)
-
-        data = self._get_data_object()
+        data = self._active_data
         data.custom_font_object = font_object
 
     def change_default_font(self, new_font: str, font_size: int = 12, bold=False, italic=False, underline=False):
@@ -1006,15 +1404,10 @@ class EduDraw:
         :param italic: Whether the font should be italic or not
         :param underline: Whether the font should have an underline or not
         """
-        font_path = pygame.font.match_font(new_font)
-        font_object = pygame.font.Font(font_path, font_size)
-
-        font_object.set_bold(bold)
-        font_object.set_italic(italic)
-        font_object.set_underline(underline)
+        font_object = _load_font(new_font, font_size, bold, italic, underline)
 
         self.original_font_instance = font_object
-        data = self._get_data_object()
+        data = self._active_data
         data.custom_font_object = font_object
 
     def font_from_instance(self, new_font: pygame.font.Font):
@@ -1026,14 +1419,14 @@ class EduDraw:
 
         :param new_font: A pygame font instance to be used
         """
-        data = self._get_data_object()
+        data = self._active_data
         data.custom_font_object = new_font
 
     def reset_font(self):
         """
         Resets the font used to the default font
         """
-        data = self._get_data_object()
+        data = self._active_data
         data.custom_font_object = None
 
     def background(self, color: tuple):
@@ -1043,15 +1436,18 @@ class EduDraw:
 
         :param color: The color to draw the background (a (R, G, B) tuple)
 
-        Note: Fast mode simply draws a rectangle
-        that fills the entire image, disabling it will cause EduDraw.clear() to be called which is more costly
-        in terms of processing.
+        Note: The background is drawn by filling the entire surface directly, which is faster than drawing a
+        rectangle over it.
         """
 
-        data = self._get_data_object()
+        color = pygame.Color(color)
+
+        data = self._active_data
         data.current_background_color = color
+        data.colors_changed()
 
-        pygame.draw.rect(self.screen, color, (0, 0, self.width, self.height))
+        self.screen.fill(color)
+        self._full_update = True
 
     def circle(self, x: int, y: int, radius: int):
         """
@@ -1076,62 +1472,80 @@ class EduDraw:
         :param height: The height of the y-axis of the ellipse
         """
 
-        data = self._get_data_object()
+        data = self._active_data
+        screen = self.screen
 
         if data.cumulative_rotation_angle == 0:
             has_rotation = False
+            pos_x, pos_y = data.circle_origin(x, y, width, height)
         else:
             has_rotation = True
+            pos_x, pos_y = data.circle_center(x, y, width, height)
 
-        pos_x, pos_y = self._get_circle_box(x, y, width, height, has_rotation)
-        pos_x, pos_y = self._apply_transformations_coords(pos_x, pos_y)
+        if data.applied_transformations:
+            pos_x, pos_y = self._apply_transformations_coords(data, pos_x, pos_y)
+            width, height = self._apply_transformations_length(data, width, height)
         pos_x, pos_y = int(pos_x), int(pos_y)
-
-        width, height = self._apply_transformations_length(width, height)
         width, height = int(width), int(height)
 
-        stroke_color, fill_color, stroke_weight = self._get_stroke_fill_and_weight()
+        stroke_color, fill_color, stroke_weight = self._get_stroke_fill_and_weight(data)
 
         if not has_rotation or width == height:
+            if self._is_off_screen(pos_x, pos_y, width, height):
+                return
+
+            draw_stroke = self._stroke_is_visible(data, stroke_color, fill_color, stroke_weight)
+
+            rect = self._scratch_rect
+            rect.update(pos_x, pos_y, width, height)
+
             if data.fill_state:
                 if data.anti_aliasing:
-                    gfxdraw.filled_ellipse(self.screen, pos_x + width // 2, pos_y + height // 2, width // 2,
+                    gfxdraw.filled_ellipse(screen, pos_x + width // 2, pos_y + height // 2, width // 2,
                                            height // 2, fill_color)
+                    self._full_update = True
                 else:
-                    pygame.draw.ellipse(self.screen, fill_color, (pos_x, pos_y, width, height), 0)
+                    self._dirty_rects.append(_draw_ellipse(screen, fill_color, rect, 0))
 
-            if data.stroke_state:
+            if draw_stroke:
                 if data.anti_aliasing:
-                    gfxdraw.aaellipse(self.screen, pos_x + width // 2, pos_y + height // 2, width // 2,
+                    gfxdraw.aaellipse(screen, pos_x + width // 2, pos_y + height // 2, width // 2,
                                       height // 2, stroke_color)
+                    self._full_update = True
                 else:
-                    pygame.draw.ellipse(self.screen, stroke_color, (pos_x, pos_y, width, height),
-                                        data.current_stroke_weight)
+                    self._dirty_rects.append(_draw_ellipse(screen, stroke_color, rect, stroke_weight))
             return
 
-        new_surface = pygame.surface.Surface((width + 1, height + 1), pygame.SRCALPHA)
-
-        if data.anti_aliasing:
-            if data.stroke_state:
-                gfxdraw.aaellipse(new_surface, width//2, height//2, width//2, height//2, stroke_color)
-            if data.fill_state:
-                gfxdraw.filled_ellipse(new_surface, width//2, height//2, width//2, height//2, fill_color)
-        else:
-            if data.fill_state:
-                pygame.draw.ellipse(new_surface, fill_color, (0, 0, width, height), 0)
+        # Whatever the rotation, the slanted ellipse stays within a square around its center
+        radius = max(width, height) / 2 + stroke_weight
+        if self._is_off_screen(pos_x - radius, pos_y - radius, radius * 2, radius * 2):
+            return
 
-            if data.stroke_state:
-                pygame.draw.ellipse(new_surface, stroke_color, (0, 0, width, height),
-                                    data.current_stroke_weight)
+        # Slanted ellipses are drawn as polygons around (pos_x, pos_y), instead of drawing them onto a new surface
+        # and rotating it
+        radians = math.radians(data.cumulative_rotation_angle)
+        angle_sin, angle_cos = math.sin(radians), math.cos(radians)
+        half_width, half_height = width / 2, height / 2
 
-        new_surface = pygame.transform.rotate(new_surface, -data.cumulative_rotation_angle)
+        points = []
+        for unit_x, unit_y in _UNIT_CIRCLE:
+            point_x, point_y = unit_x * half_width, unit_y * half_height
+            points.append((pos_x + point_x * angle_cos - point_y * angle_sin,
+                           pos_y + point_x * angle_sin + point_y * angle_cos))
 
-        new_width, new_height = new_surface.get_size()
+        if data.fill_state:
+            if data.anti_aliasing:
+                gfxdraw.filled_polygon(screen, points, fill_color)
+                self._full_update = True
+            else:
+                self._dirty_rects.append(_draw_polygon(screen, fill_color, points, 0))
 
-        try:
-            self.screen.blit(new_surface, (int(pos_x - new_width / 2), int(pos_y - new_height / 2)))
-        except pygame.error:
-            pass
+        if self._stroke_is_visible(data, stroke_color, fill_color, stroke_weight, False):
+            if data.anti_aliasing:
+                gfxdraw.aapolygon(screen, points, stroke_color)
+                self._full_update = True
+            else:
+                self._dirty_rects.append(_draw_polygon(screen, stroke_color, points, stroke_weight))
 
     def line(self, x1: int, y1: int, x2: int, y2: int):
         """
@@ -1142,19 +1556,22 @@ class EduDraw:
         :param x2: The x coordinate of the second point
         :param y2: The y coordinate of the second point
         """
-        x1, y1 = self._apply_transformations_coords(x1, y1)
-        x2, y2 = self._apply_transformations_coords(x2, y2)
+        data = self._active_data
+        screen = self.screen
+
+        if data.applied_transformations:
+            x1, y1 = self._apply_transformations_coords(data, x1, y1)
+            x2, y2 = self._apply_transformations_coords(data, x2, y2)
         x1, y1 = int(x1), int(y1)
         x2, y2 = int(x2), int(y2)
 
-        stroke_color, fill_color, stroke_weight = self._get_stroke_fill_and_weight()
-
-        data = self._get_data_object()
+        stroke_color, fill_color, stroke_weight = self._get_stroke_fill_and_weight(data)
 
         if data.anti_aliasing:
-            gfxdraw.line(self.screen, x1, y1, x2, y2, stroke_color)
+            gfxdraw.line(screen, x1, y1, x2, y2, stroke_color)
+            self._full_update = True
         else:
-            pygame.draw.line(self.screen, stroke_color, (x1, y1), (x2, y2), stroke_weight)
+            self._dirty_rects.append(_draw_line(screen, stroke_color, (x1, y1), (x2, y2), stroke_weight))
 
     def rect(self, x: int, y: int, width: int, height: int):
         """
@@ -1166,31 +1583,43 @@ class EduDraw:
         :param width: The width of the rectangle
         :param height: The height of the rectangle
         """
-        pos_x, pos_y = self._get_rect_box(x, y, width, height)
-        data = self._get_data_object()
+        data = self._active_data
+        screen = self.screen
+        pos_x, pos_y = data.rect_origin(x, y, width, height)
 
-        stroke_color, fill_color, stroke_weight = self._get_stroke_fill_and_weight()
+        stroke_color, fill_color, stroke_weight = self._get_stroke_fill_and_weight(data)
 
-        if data.cumulative_rotation_angle != 0:
-            pts = [(pos_x, pos_y), (pos_x + width, pos_y), (pos_x + width, pos_y + height), (pos_x, pos_y + height)]
+        # Without transformations the rectangle is drawn where it was asked to be
+        if data.applied_transformations:
+            if data.cumulative_rotation_angle != 0:
+                pts = [(pos_x, pos_y), (pos_x + width, pos_y), (pos_x + width, pos_y + height),
+                       (pos_x, pos_y + height)]
 
-            self.polygon(pts)
+                self.polygon(pts)
+                return
+
+            pos_x, pos_y = self._apply_transformations_coords(data, pos_x, pos_y, True)
+            width, height = self._apply_transformations_length(data, width, height)
+
+        if self._is_off_screen(pos_x, pos_y, width, height):
             return
 
-        pos_x, pos_y = self._apply_transformations_coords(pos_x, pos_y, True)
-        width, height = self._apply_transformations_length(width, height)
+        rect = self._scratch_rect
+        rect.update(pos_x, pos_y, width, height)
 
         if data.fill_state:
             if data.anti_aliasing:
-                gfxdraw.box(self.screen, (pos_x, pos_y, width, height), fill_color)
+                gfxdraw.box(screen, rect, fill_color)
+                self._full_update = True
             else:
-                pygame.draw.rect(self.screen, fill_color, (pos_x, pos_y, width, height), 0)
+                self._dirty_rects.append(_draw_rect(screen, fill_color, rect, 0))
 
-        if data.stroke_state:
+        if self._stroke_is_visible(data, stroke_color, fill_color, stroke_weight):
             if data.anti_aliasing:
-                gfxdraw.rectangle(self.screen, (pos_x, pos_y, width, height), stroke_color)
+                gfxdraw.rectangle(screen, rect, stroke_color)
+                self._full_update = True
             else:
-                pygame.draw.rect(self.screen, stroke_color, (pos_x, pos_y, width, height), stroke_weight)
+                self._dirty_rects.append(_draw_rect(screen, stroke_color, rect, stroke_weight))
 
     def square(self, x: int, y: int, side_size: int):
         """
@@ -1214,53 +1643,60 @@ class EduDraw:
         :param x3: The x coordinate of the third point
         :param y3: The y coordinate of the third point
         """
-        stroke_color, fill_color, stroke_weight = self._get_stroke_fill_and_weight()
+        data = self._active_data
+        screen = self.screen
 
-        x1, y1 = self._apply_transformations_coords(x1, y1)
-        x2, y2 = self._apply_transformations_coords(x2, y2)
-        x3, y3 = self._apply_transformations_coords(x3, y3)
+        stroke_color, fill_color, stroke_weight = self._get_stroke_fill_and_weight(data)
 
-        data = self._get_data_object()
+        (x1, y1), (x2, y2), (x3, y3) = self._apply_transformations_coords_batch(data, ((x1, y1), (x2, y2), (x3, y3)))
 
         if data.fill_state:
             if data.anti_aliasing:
-                gfxdraw.filled_trigon(self.screen, x1, y1, x2, y2, x3, y3, fill_color)
+                gfxdraw.filled_trigon(screen, x1, y1, x2, y2, x3, y3, fill_color)
+                self._full_update = True
             else:
-                pygame.draw.polygon(self.screen, fill_color, ((x1, y1), (x2, y2), (x3, y3)), 0)
+                self._dirty_rects.append(_draw_polygon(screen, fill_color, ((x1, y1), (x2, y2), (x3, y3)), 0))
 
-        if data.stroke_state:
+        if self._stroke_is_visible(data, stroke_color, fill_color, stroke_weight, False):
             if data.anti_aliasing:
-                gfxdraw.aatrigon(self.screen, x1, y1, x2, y2, x3, y3, stroke_color)
+                gfxdraw.aatrigon(screen, x1, y1, x2, y2, x3, y3, stroke_color)
+                self._full_update = True
             else:
-                pygame.draw.polygon(self.screen, stroke_color, ((x1, y1), (x2, y2), (x3, y3)), stroke_weight)
+                self._dirty_rects.append(_draw_polygon(screen, stroke_color, ((x1, y1), (x2, y2), (x3, y3)),
+                                                       stroke_weight))
 
     def polygon(self, points: list | tuple):
         """
         Draws a polygon onto the screen
 
         :param points: A list containing the tuples of the coordinates of the points to be connected, as in [(x1, y1),
-        (x2, y2), (x3, y3), ..., (xn, yn)]
+        (x2, y2), (x3, y3), ..., (xn, yn)]. When no transformations are applied the points are used as they are, so
+        geometry that changes every frame can be kept in the same list and updated in place.
         """
-        stroke_color, fill_color, stroke_weight = self._get_stroke_fill_and_weight()
+        data = self._active_data
+        screen = self.screen
 
-        data = self._get_data_object()
+        stroke_color, fill_color, stroke_weight = self._get_stroke_fill_and_weight(data)
 
-        points = [self._apply_transformations_coords(x[0], x[1]) for x in points]
+        if data.applied_transformations:
+            points = self._apply_transformations_coords_batch(data, points)
 
         if data.fill_state:
             if data.anti_aliasing:
-                gfxdraw.filled_polygon(self.screen, points, fill_color)
+                gfxdraw.filled_polygon(screen, points, fill_color)
+                self._full_update = True
             else:
-                pygame.draw.polygon(self.screen, fill_color, points, 0)
+                self._dirty_rects.append(_draw_polygon(screen, fill_color, points, 0))
 
-        if data.stroke_state:
+        if self._stroke_is_visible(data, stroke_color, fill_color, stroke_weight, False):
             if data.anti_aliasing:
-                gfxdraw.aapolygon(self.screen, points, stroke_color)
+                gfxdraw.aapolygon(screen, points, stroke_color)
+                self._full_update = True
             else:
-                pygame.draw.polygon(self.screen, stroke_color, points, stroke_weight)
+                self._dirty_rects.append(_draw_polygon(screen, stroke_color, points, stroke_weight))
 
     def image(self, img: pygame.surface.Surface, x: int, y: int, width: int = None, height: int = None,
-              force_transparency: bool = False):
+              force_transparency: bool = False, cache: bool = False):
         """
         Displays an image onto the screen on the (x,y) position.
         If specified a width or height, the image will be resized to those sizes, otherwise, the image will be drawn
@@ -1272,16 +1708,15 @@ class EduDraw:
         :param width: (Optional) The width to resize the image
         :param height: (Optional) The height to resize the image
         :param force_transparency: (Optional) Whether or not to force transparency on non-rgba images.
+        :param cache: (Optional) Whether to keep the resized and rotated image to reuse it the next time the same image
+        is drawn with the same size and rotation. Only use it for images that aren't modified after being drawn.
         """
 
         size = img.get_size()
 
-        if force_transparency:
-            intermediary_surface = pygame.surface.Surface(size, flags=pygame.SRCALPHA)
-            intermediary_surface.blit(img, (0, 0))
-            img = intermediary_surface
-
-        data = self._get_data_object()
+        data = self._active_data
+        screen = self.screen
+        angle = data.cumulative_rotation_angle
 
         if width is None:
             width = size[0]
@@ -1289,7 +1724,7 @@ class EduDraw:
         if height is None:
             height = size[1]
 
-        target_width, target_height = self._apply_transformations_length(width, height)
+        target_width, target_height = self._apply_transformations_length(data, width, height)
 
         if target_width == 0 or target_height == 0:
             return
@@ -1297,28 +1732,39 @@ class EduDraw:
         if target_width < 0 or target_height < 0:
             raise ValueError
 
-        img = pygame.transform.scale(img, (target_width, target_height))
-        img = pygame.transform.rotate(img, -data.cumulative_rotation_angle)
-
-        has_rotation = data.cumulative_rotation_angle != 0
+        has_rotation = angle != 0
 
         if not has_rotation:
-            invert = False
+            x, y = data.rect_origin(x, y, width, height)
         else:
-            invert = True
+            x, y = data.rect_center(x, y, width, height)
+        x, y = self._apply_transformations_coords(data, x, y)
 
-        x, y = self._get_rect_box(x, y, width, height, invert)
-        x, y = self._apply_transformations_coords(x, y)
+        # Images outside of the screen are skipped before they're resized or rotated
+        if not has_rotation:
+            if self._is_off_screen(x, y, target_width, target_height):
+                return
+        else:
+            radians = math.radians(angle)
+            angle_sin, angle_cos = abs(math.sin(radians)), abs(math.cos(radians))
+            bound_w = target_width * angle_cos + target_height * angle_sin
+            bound_h = target_width * angle_sin + target_height * angle_cos
+            if self._is_off_screen(x - bound_w / 2, y - bound_h / 2, bound_w, bound_h):
+                return
 
-        real_w, real_h = img.get_size()
+        if cache:
+            img = _transform_image_cached(img, target_width, target_height, angle, force_transparency)
+        else:
+            img = _transform_image(img, target_width, target_height, angle, force_transparency)
 
         if not has_rotation:
-            box = (int(x), int(y), real_w, real_h)
+            box = (int(x), int(y))
         else:
-            box = (int(x - real_w//2), int(y - real_h//2), real_w, real_h)
+            real_w, real_h = img.get_size()
+            box = (int(x) - (real_w >> 1), int(y) - (real_h >> 1))
 
         try:
-            self.screen.blit(img, box)
+            self._dirty_rects.append(screen.blit(img, box))
         except pygame.error:
             pass
 
@@ -1329,21 +1775,20 @@ class EduDraw:
         :param control_points: A list of tuples containing the coordinates of the control points for the curve
         :param num_points: The number of points to be used as steps for the lines. Default: 30
         """
-        data = self._get_data_object()
+        data = self._active_data
 
         b_points = self._compute_bezier_points(control_points, num_points)
 
         if b_points is None:
             return
 
-        for i, elem in enumerate(b_points):
-            new_point = self._apply_transformations_coords(elem[0], elem[1])
-            b_points[i] = new_point
+        if data.applied_transformations:
+            b_points = self._apply_transformations_coords_batch(data, b_points)
 
-        stroke_color, fill_color, stroke_weight = self._get_stroke_fill_and_weight()
+        stroke_color, fill_color, stroke_weight = self._get_stroke_fill_and_weight(data)
 
         if data.stroke_state:
-            pygame.draw.lines(self.screen, stroke_color, False, b_points, stroke_weight)
+            self._dirty_rects.append(pygame.draw.lines(self.screen, stroke_color, False, b_points, stroke_weight))
 
     def arc_open(self, start_angle: int, stop_angle: int, x: int, y: int, width: int, height: int):
         """
@@ -1357,19 +1802,20 @@ class EduDraw:
         :param width: The width of the ellipse to create the arc
         :param height: The height of the ellipse to create the arc
         """
-        data = self._get_data_object()
+        data = self._active_data
         color = data.current_stroke_color
 
         if data.cumulative_rotation_angle == 0:
             has_rotation = False
+            pos_x, pos_y = data.circle_origin(x, y, width, height)
         else:
             has_rotation = True
+            pos_x, pos_y = data.circle_center(x, y, width, height)
 
-        pos_x, pos_y = self._get_circle_box(x, y, width, height, has_rotation)
-        pos_x, pos_y = self._apply_transformations_coords(pos_x, pos_y)
+        pos_x, pos_y = self._apply_transformations_coords(data, pos_x, pos_y)
         pos_x, pos_y = int(pos_x), int(pos_y)
 
-        width, height = self._apply_transformations_length(width, height)
+        width, height = self._apply_transformations_length(data, width, height)
         width, height = int(width), int(height)
 
         # Circles and non-slanted ellipses have simple drawings
@@ -1383,8 +1829,8 @@ class EduDraw:
             # pos_x -= width//2
             # pos_y -= height//2
 
-            pygame.draw.arc(self.screen, color, (pos_x, pos_y, width, height), start_angle,
-                            stop_angle, data.current_stroke_weight)
+            self._dirty_rects.append(pygame.draw.arc(self.screen, color, (pos_x, pos_y, width, height), start_angle,
+                                                     stop_angle, data.current_stroke_weight))
             return
 
         start_angle = math.radians(start_angle)
@@ -1400,7 +1846,8 @@ class EduDraw:
         new_width, new_height = new_surface.get_size()
 
         try:
-            self.screen.blit(new_surface, (int(pos_x - new_width / 2), int(pos_y - new_height / 2)))
+            self._dirty_rects.append(self.screen.blit(new_surface, (int(pos_x - new_width / 2),
+                                                                    int(pos_y - new_height / 2))))
         except pygame.error:
             pass
 
@@ -1430,14 +1877,14 @@ class EduDraw:
         if start_angle > stop_angle:
             inverted = True
 
-        stroke_color, fill_color, stroke_weight = self._get_stroke_fill_and_weight()
-        data = self._get_data_object()
+        data = self._active_data
+        stroke_color, fill_color, stroke_weight = self._get_stroke_fill_and_weight(data)
 
-        pos_x, pos_y = self._get_circle_box(x, y, width, height, True)
-        pos_x, pos_y = self._apply_transformations_coords(pos_x, pos_y)
+        pos_x, pos_y = data.circle_center(x, y, width, height)
+        pos_x, pos_y = self._apply_transformations_coords(data, pos_x, pos_y)
         pos_x, pos_y = int(pos_x), int(pos_y)
 
-        width, height = self._apply_transformations_length(width, height)
+        width, height = self._apply_transformations_length(data, width, height)
         width, height = int(width), int(height)
 
         new_image = pygame.surface.Surface((width + 1, height + 1), flags=pygame.SRCALPHA)
@@ -1450,10 +1897,10 @@ class EduDraw:
                 gfxdraw.filled_ellipse(new_image, width//2, height//2, width//2, height//2, fill_color)
         else:
             if data.fill_state:
-                pygame.draw.ellipse(new_image, fill_color, (0, 0, width, height), 0)
+                _draw_ellipse(new_image, fill_color, (0, 0, width, height), 0)
 
-            if data.stroke_state:
-                pygame.draw.ellipse(new_image, stroke_color, (0, 0, width, height), stroke_weight)
+            if self._stroke_is_visible(data, stroke_color, fill_color, stroke_weight):
+                _draw_ellipse(new_image, stroke_color, (0, 0, width, height), stroke_weight)
 
         # Calculating and drawing polygon to make pie shape
         sorted_points = []
@@ -1508,14 +1955,14 @@ class EduDraw:
 
         sorted_points.insert(starting_index, (width//2, height//2))
 
-        pygame.draw.polygon(new_image, data.current_background_color, sorted_points, 0)
+        _draw_polygon(new_image, data.current_background_color, sorted_points, 0)
 
         if close_edges:
             point_start = self._get_intersection_angle_ellipse(-start_angle, width, height)
             point_stop = self._get_intersection_angle_ellipse(-stop_angle, width, height)
 
-            pygame.draw.line(new_image, stroke_color, (width//2, height//2), point_start, stroke_weight)
-            pygame.draw.line(new_image, stroke_color, (width//2, height//2), point_stop, stroke_weight)
+            _draw_line(new_image, stroke_color, (width//2, height//2), point_start, stroke_weight)
+            _draw_line(new_image, stroke_color, (width//2, height//2), point_stop, stroke_weight)
 
         new_image = pygame.transform.rotate(new_image, -data.cumulative_rotation_angle)
 
@@ -1523,7 +1970,8 @@ class EduDraw:
 
         new_image.set_colorkey(data.current_background_color)
         try:
-            self.screen.blit(new_image, (int(pos_x - new_width / 2), int(pos_y - new_height / 2)))
+            self._dirty_rects.append(self.screen.blit(new_image, (int(pos_x - new_width / 2),
+                                                                  int(pos_y - new_height / 2))))
             # self.screen.blit(new_image, (int(pos_x), int(pos_y)))
         except pygame.error:
             pass
@@ -1555,14 +2003,14 @@ class EduDraw:
         if start_angle > stop_angle:
             inverted = True
 
-        stroke_color, fill_color, stroke_weight = self._get_stroke_fill_and_weight()
-        data = self._get_data_object()
+        data = self._active_data
+        stroke_color, fill_color, stroke_weight = self._get_stroke_fill_and_weight(data)
 
-        pos_x, pos_y = self._get_circle_box(x, y, width, height, True)
-        pos_x, pos_y = self._apply_transformations_coords(pos_x, pos_y)
+        pos_x, pos_y = data.circle_center(x, y, width, height)
+        pos_x, pos_y = self._apply_transformations_coords(data, pos_x, pos_y)
         pos_x, pos_y = int(pos_x), int(pos_y)
 
-        width, height = self._apply_transformations_length(width, height)
+        width, height = self._apply_transformations_length(data, width, height)
         width, height = int(width), int(height)
 
         new_image = pygame.surface.Surface((width + 1, height + 1), flags=pygame.SRCALPHA)
@@ -1575,10 +2023,10 @@ class EduDraw:
                 gfxdraw.filled_ellipse(new_image, width // 2, height // 2, width // 2, height // 2, fill_color)
         else:
             if data.fill_state:
-                pygame.draw.ellipse(new_image, fill_color, (0, 0, width, height), 0)
+                _draw_ellipse(new_image, fill_color, (0, 0, width, height), 0)
 
-            if data.stroke_state:
-                pygame.draw.ellipse(new_image, stroke_color, (0, 0, width, height), stroke_weight)
+            if self._stroke_is_visible(data, stroke_color, fill_color, stroke_weight):
+                _draw_ellipse(new_image, stroke_color, (0, 0, width, height), stroke_weight)
 
         # Calculating and drawing polygon to make shape
         sorted_points = []
@@ -1654,10 +2102,10 @@ class EduDraw:
         for i in range(len(unsorted_points)):
             sorted_points.append(unsorted_points[i][1])
 
-        pygame.draw.polygon(new_image, data.current_background_color, sorted_points, 0)
+        _draw_polygon(new_image, data.current_background_color, sorted_points, 0)
 
         if close_edges:
-            pygame.draw.line(new_image, stroke_color, point_start_angle, point_stop_angle, stroke_weight)
+            _draw_line(new_image, stroke_color, point_start_angle, point_stop_angle, stroke_weight)
 
         new_image = pygame.transform.rotate(new_image, -data.cumulative_rotation_angle)
 
@@ -1665,7 +2113,8 @@ class EduDraw:
 
         new_image.set_colorkey(data.current_background_color)
         try:
-            self.screen.blit(new_image, (int(pos_x - new_width / 2), int(pos_y - new_height / 2)))
+            self._dirty_rects.append(self.screen.blit(new_image, (int(pos_x - new_width / 2),
+                                                                  int(pos_y - new_height / 2))))
             # self.screen.blit(new_image, (int(pos_x), int(pos_y)))
         except pygame.error:
             pass
@@ -1706,6 +2155,8 @@ class EduDraw:
 
         :return: The currently drawn frame from when this method was called.
         """
+        # The returned surface may be drawn onto directly, which can't be tracked as a dirty area
+        self._full_update = True
         return self.screen
 
     def change_icon(self, image: pygame.surface.Surface):
@@ -1820,14 +2271,49 @@ class EduDraw:
 
     def save(self, filename: str):
         """
-        Saves a picture of the current frame
+        Saves a picture of the current frame. The file is written in the background, so the frame doesn't have to
+        wait for the image to be encoded. If a picture can't be saved, its error is raised by a later call to save(),
+        or by this one if it failed right away, or by quit()
 
         :param filename: The name to give the resulting file (Ex: 'MyPhoto.png')
         """
         if filename == '':
             filename = f'{self.frame_count}.png'
-        # self.current_frame.save(filename)
-        pygame.image.save(self.screen, filename)
+
+        if self._save_executor is None:
+            self._save_executor = ThreadPoolExecutor(max_workers=1)
+
+        # The screen keeps being drawn onto while the picture is saved, so a copy of the current frame is used
+        self._pending_saves.append(self._save_executor.submit(pygame.image.save, self.screen.copy(), filename))
+
+        self._check_pending_saves(False)
+
+    def _check_pending_saves(self, wait: bool):
+        """
+        Raises the errors of the background saves that failed, if any. Each save is only checked once it's finished
+
+        :param wait: Whether to wait for all saves to finish, otherwise only the finished ones are checked
+        """
+        finished = []
+        still_pending = []
+
+        # Each future is only asked once whether it's done, so one finishing meanwhile can't be checked twice
+        for future in self._pending_saves:
+            if wait or future.done():
+                finished.append(future)
+            else:
+                still_pending.append(future)
+
+        self._pending_saves = still_pending
+
+        errors = [error for error in (future.exception() for future in finished) if error is not None]
+
+        if len(errors) == 1:
+            raise errors[0]
+
+        if errors:
+            messages = "; ".join(str(error) for error in errors)
+            raise pygame.error(f"{len(errors)} pictures couldn't be saved: {messages}")
 
     def quit(self):
         global _instance_handler
@@ -1839,3 +2325,10 @@ class EduDraw:
 
         if not self.null_mode:
             _instance_handler.quit_all()
+            _clear_font_caches()
+
+        # Waits for pictures that are still being saved
+        if self._save_executor is not None:
+            self._save_executor.shutdown()
+            self._save_executor = None
+            self._check_pending_saves(True)
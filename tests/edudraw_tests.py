@@ -37,7 +37,7 @@ flag_has_null = False
 def draw():
     global flag_done, start, end, flag_has_null
 
-    # print(s._get_data_object().custom_font_object)
+    # print(s._active_data.custom_font_object)
 
     if antialias:
         s.toggle_antialiasing()
@@ -502,6 +502,42 @@ def test_point():
 tests.append(test_point)
 
 
+def test_point_batch():
+    global flag_done
+    s.background((0, 0, 0))
+
+    s.stroke((255, 255, 255))
+    s.point_batch([(x, y) for x in range(0, s.width, 10) for y in range(0, s.height, 10)])
+
+    s.stroke((255, 0, 0))
+    s.translate(s.width // 2, s.height // 2)
+    s.point_batch([(x, x) for x in range(-50, 50)])
+
+    if s.frame_count > 60:
+        flag_done = True
+
+
+tests.append(test_point_batch)
+
+
+def test_image_cache():
+    global flag_done
+    s.background((200, 200, 200))
+
+    # The same image is drawn every frame, so its transformed versions are reused from the cache
+    s.rect_mode("CENTER")
+    s.translate(s.width // 2, s.height // 2)
+    s.rotate(s.frame_count)
+    s.scale(0.5 + (s.frame_count % 30) / 60, 0.5 + (s.frame_count % 30) / 60)
+    s.image(img, 0, 0, 200, 200, cache=True)
+
+    if s.frame_count > 60:
+        flag_done = True
+
+
+tests.append(test_image_cache)
+
+
 def test_circle():
     global flag_done
 
@@ -874,4 +910,29 @@ def test_framerate():
 tests.append(test_framerate)
 
 
+skipped_before = 0
+
+
+def test_frame_skip():
+    global flag_done, skipped_before
+    s.background((255, 255, 255))
+    s.fill((0, 0, 255))
+
+    if s.frame_count == 1:
+        s.frame_rate(50)
+        skipped_before = s.frames_skipped
+
+    # Each frame takes longer than the 20ms available at 50 FPS, so the missed frames should be skipped
+    time.sleep(0.05)
+    s.circle(s.frame_count * 10 % s.width, s.height // 2, 25)
+
+    if s.frame_count > 30:
+        print(f"Frames skipped: {s.frames_skipped - skipped_before} (should be more than 0)")
+        s.use_max_frame_rate()
+        flag_done = True
+
+
+tests.append(test_frame_skip)
+
+
 s.start(setup, draw, "Running tests")